@@ -1,10 +1,67 @@
-import usb.core
-import usb.util
+import usb1
 import serial
 import serial.tools.list_ports
+import serial_asyncio
+import asyncio
 import json
-import time
-from threading import Thread
+import mmap
+import os
+import select
+import struct
+import sys
+from collections import deque
+
+try:
+    import orjson
+except ImportError:  # Optional, the standard json module is used without it
+    orjson = None
+
+# Number of USB transfers kept queued at the RFID endpoint
+RFID_TRANSFERS = 8
+
+# Each transfer can hold several reader reports; a transfer that is still
+# partially filled after the timeout completes with whatever arrived
+RFID_REPORTS_PER_TRANSFER = 16
+RFID_TRANSFER_TIMEOUT = 50  # ms
+
+# Transfer statuses resolved once rather than looked up on usb1 per completion.
+# A timeout is the normal idle case and may still carry reports.
+_RFID_DATA_STATUSES = frozenset((usb1.TRANSFER_COMPLETED, usb1.TRANSFER_TIMED_OUT))
+
+# Failed transfers are resubmitted after a delay that doubles on each
+# consecutive failure, so a faulty endpoint cannot spin the loop (seconds)
+RFID_RETRY_DELAY = 0.1
+RFID_RETRY_DELAY_MAX = 2.0
+_RFID_ERROR_NAMES = {
+    usb1.TRANSFER_ERROR: "error",
+    usb1.TRANSFER_STALL: "stall",
+    usb1.TRANSFER_OVERFLOW: "overflow",
+}
+
+# How long the access LEDs stay lit after a card read (seconds)
+LED_FEEDBACK_DURATION = 1.0
+
+# Interval between status updates to the Arduino (seconds)
+STATUS_INTERVAL = 2
+
+# Serial link rate; must match Serial.begin() in 4BTask.ino
+SERIAL_BAUD_RATE = 500000
+
+# Binary serial protocol: fixed-size frames
+# [magic][opcode][arg1][arg2][arg3][checksum], checksum = opcode ^ arg1 ^ arg2 ^ arg3
+FRAME_MAGIC = 0xA5
+OP_LED = 1          # arg1 = pin, arg2 = on/off
+OP_SERVO_EN = 2     # arg1 = enable/disable
+OP_SERVO_POS = 3    # arg1 = angle
+OP_STATUS = 4       # arg1 = servo position, arg2 = enabled, arg3 = cards registered
+_pack_frame = struct.Struct('<6B').pack
+
+def _frame(opcode, arg1=0, arg2=0, arg3=0):
+    """Encode one command frame, checksum included"""
+    return _pack_frame(FRAME_MAGIC, opcode, arg1, arg2, arg3, opcode ^ arg1 ^ arg2 ^ arg3)
+
+# Config file encoder, built once instead of on every save
+_config_encoder = json.JSONEncoder(indent=2)
 
 class RFIDServoController:
     def __init__(self):
@@ -15,46 +72,188 @@ class RFIDServoController:
             "authorized_cards": ["A1B2C3D4", "E5F6G7H8"],
             "servo_default_pos": 90,
             "servo_allowed_pos": 180,
-            "baud_rate": 9600,
             "led_pins": {"green": 3, "red": 4}
         }
+        self._refresh_authorized_cards()
+        self._refresh_hardware_config()
         
         # System state
         self.servo_control_enabled = False
         self.current_servo_pos = self.config["servo_default_pos"]
         
-        # Initialize hardware
-        self.init_rfid_reader()
-        self.init_serial_connection()
-        self.load_config()
+        # Everything runs on one asyncio event loop, created by run()
+        self.loop = None
+        self.ser = None  # Serial stream writer, opened on the event loop
+        
+        # Outgoing serial bytes, written in one batch per loop iteration
+        self._tx_buf = bytearray()
+        
+        self._led_timers = {}  # Pending LED-off timer handles, keyed by LED color
+        self._usb_timer = None  # Pending libusb timeout handling
+        
+        # Last LED states sent, so unchanged states are not resent; forgotten
+        # whenever the Arduino reports driving the LEDs itself
+        self._led_state = {"green": False, "red": False}
         
-        # Start status thread
+        # Initialize hardware; the serial link is opened on the event loop
         self.running = True
-        self.status_thread = Thread(target=self.send_status_updates)
-        self.status_thread.start()
+        self.init_rfid_reader()
+        self.load_config()
 
     def init_rfid_reader(self):
         """Initialize the USB RFID reader"""
-        self.dev = usb.core.find(
-            idVendor=self.config["vendor_id"],
-            idProduct=self.config["product_id"]
+        self.usb_ctx = usb1.USBContext()
+        self.dev_handle = self.usb_ctx.openByVendorIDAndProductID(
+            self.config["vendor_id"],
+            self.config["product_id"],
+            skip_on_error=True
         )
         
-        if self.dev is None:
+        if self.dev_handle is None:
             raise ValueError("RFID reader not found")
             
-        if self.dev.is_kernel_driver_active(0):
-            self.dev.detach_kernel_driver(0)
+        if self.dev_handle.kernelDriverActive(0):
+            self.dev_handle.detachKernelDriver(0)
             
-        self.dev.set_configuration()
-        self.endpoint = self.dev[0][(0, 0)][0]
+        usb_config = self.dev_handle.getDevice()[0]
+        self.dev_handle.setConfiguration(usb_config.getConfigurationValue())
+        self.dev_handle.claimInterface(0)
+        self.endpoint = usb_config[0][0][0]
+        self.report_size = self.endpoint.getMaxPacketSize()
+        
+        # Keep several transfers in flight so a card read never waits
+        # on a fresh USB round-trip. Each transfer reads into its own
+        # preallocated buffer, reused every time the transfer is resubmitted.
+        self.rx_queue = deque()
+        self.transfers = []
+        self._rfid_retry_delay = RFID_RETRY_DELAY
+        interrupt = (self.endpoint.getAttributes() & 0x03) == 0x03
+        for _ in range(RFID_TRANSFERS):
+            rx_buf = bytearray(self.report_size * RFID_REPORTS_PER_TRANSFER)
+            transfer = self.dev_handle.getTransfer()
+            setup = transfer.setInterrupt if interrupt else transfer.setBulk
+            setup(
+                self.endpoint.getAddress(),
+                rx_buf,
+                callback=self.on_rfid_transfer,
+                user_data=rx_buf,
+                timeout=RFID_TRANSFER_TIMEOUT
+            )
+            transfer.submit()
+            self.transfers.append(transfer)
 
-    def init_serial_connection(self):
+    def on_rfid_transfer(self, transfer):
+        """libusb completion callback: queue transfers carrying card data"""
+        status = transfer.getStatus()
+        if status in _RFID_DATA_STATUSES:
+            self._rfid_retry_delay = RFID_RETRY_DELAY
+            if transfer.getActualLength():
+                # Resubmitted by drain_rfid_transfers once its buffer has been processed
+                self.rx_queue.append(transfer)
+            else:
+                self._resubmit_transfer(transfer)
+        elif status == usb1.TRANSFER_CANCELLED:
+            return
+        elif status == usb1.TRANSFER_NO_DEVICE:
+            # Every in-flight transfer fails this way; report the loss once
+            if self.running:
+                print("RFID reader disconnected, shutting down")
+                self.stop()
+        elif self.running:
+            print(f"RFID transfer {_RFID_ERROR_NAMES.get(status, status)}, "
+                  f"retrying in {self._rfid_retry_delay:g}s")
+            if status == usb1.TRANSFER_STALL:
+                try:
+                    self.dev_handle.clearHalt(self.endpoint.getAddress())
+                except usb1.USBError as e:
+                    print(f"USB error: {e}")
+            self._retry_transfer(transfer)
+
+    def _retry_transfer(self, transfer):
+        """Resubmit a failed transfer after a delay that backs off on repeated errors"""
+        self.loop.call_later(self._rfid_retry_delay, self._resubmit_transfer, transfer)
+        self._rfid_retry_delay = min(self._rfid_retry_delay * 2, RFID_RETRY_DELAY_MAX)
+
+    def _resubmit_transfer(self, transfer):
+        """Put a transfer back in flight, retrying later if libusb refuses it"""
+        if not self.running:
+            return
+        try:
+            transfer.submit()
+        except usb1.USBErrorNoDevice:
+            print("RFID reader disconnected, shutting down")
+            self.stop()
+        except usb1.USBError as e:
+            print(f"USB error: {e}, retrying in {self._rfid_retry_delay:g}s")
+            self._retry_transfer(transfer)
+
+    def pump_usb_events(self):
+        """Let libusb run callbacks of completed transfers without blocking"""
+        try:
+            self.usb_ctx.handleEventsTimeout(tv=0)
+        except usb1.USBError as e:
+            print(f"USB error: {e}")
+        self.drain_rfid_transfers()
+        
+        # Come back when libusb next needs to expire a transfer, unless it
+        # tracks timeouts through its own fd
+        if self._usb_timer is not None:
+            self._usb_timer.cancel()
+        timeout = self.usb_ctx.getNextTimeout()
+        self._usb_timer = None if timeout is None else self.loop.call_later(
+            timeout, self.pump_usb_events
+        )
+
+    def drain_rfid_transfers(self):
+        """Process transfers queued by the USB callbacks and resubmit them"""
+        handle, size = self.handle_rfid_data, self.report_size
+        while self.rx_queue:
+            transfer = self.rx_queue.popleft()
+            data = memoryview(transfer.getUserData())[:transfer.getActualLength()]
+            # One card read per reader report in the transfer
+            for start in range(0, len(data), size):
+                handle(data[start:start + size])
+            data.release()
+            self._resubmit_transfer(transfer)
+
+    def _watch_usb_fd(self, fd, events, user_data=None):
+        """Have the event loop pump libusb when one of its fds is ready"""
+        if events & select.POLLIN:
+            self.loop.add_reader(fd, self.pump_usb_events)
+        if events & select.POLLOUT:
+            self.loop.add_writer(fd, self.pump_usb_events)
+
+    def _unwatch_usb_fd(self, fd, user_data=None):
+        """Stop watching a libusb fd"""
+        self.loop.remove_reader(fd)
+        self.loop.remove_writer(fd)
+
+    def close_rfid_reader(self):
+        """Cancel in-flight transfers and release the RFID reader"""
+        for transfer in self.transfers:
+            try:
+                transfer.cancel()
+            except usb1.USBError:
+                pass  # Not in flight
+        while any(transfer.isSubmitted() for transfer in self.transfers):
+            self.usb_ctx.handleEventsTimeout(tv=0.1)
+        try:
+            self.dev_handle.releaseInterface(0)
+        except usb1.USBError:
+            pass  # Reader already unplugged
+        self.dev_handle.close()
+        self.usb_ctx.close()
+
+    async def init_serial_connection(self):
         """Initialize connection to Arduino"""
         ports = serial.tools.list_ports.comports()
         for port in ports:
             try:
-                self.ser = serial.Serial(port.device, self.config["baud_rate"], timeout=1)
+                # The transport writes without blocking and buffers whatever
+                # the port cannot take yet
+                self.ser_reader, self.ser = await serial_asyncio.open_serial_connection(
+                    url=port.device, baudrate=SERIAL_BAUD_RATE
+                )
                 print(f"Connected to Arduino on {port.device}")
                 return
             except serial.SerialException:
@@ -63,29 +262,99 @@ class RFIDServoController:
 
     def load_config(self, filename="config.json"):
         """Load configuration from JSON file"""
+        previous_config = self.config.copy()
         try:
-            with open(filename, 'r') as f:
-                new_config = json.load(f)
+            # Parse straight from a read-only mapping of the file
+            with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if orjson:
+                    with memoryview(mm) as data:
+                        new_config = orjson.loads(data)
+                else:
+                    new_config = json.loads(mm[:])
                 self.config.update(new_config)
+                # The link rate is fixed by the firmware; older configs still carry one
+                baud_rate = self.config.pop("baud_rate", SERIAL_BAUD_RATE)
+                if baud_rate != SERIAL_BAUD_RATE:
+                    print(f"WARNING: ignoring baud_rate {baud_rate} from {filename}, "
+                          f"the Arduino firmware runs at {SERIAL_BAUD_RATE}")
+                self._refresh_authorized_cards()
+                self._refresh_hardware_config()
                 print("Configuration loaded successfully")
         except FileNotFoundError:
             print("No config file found, using defaults")
-        except json.JSONDecodeError:
-            print("Invalid config file, using defaults")
+        except ValueError as e:  # Malformed JSON, an empty file or bad settings
+            # Roll back anything applied before the bad value was found
+            self.config = previous_config
+            self._refresh_authorized_cards()
+            self._refresh_hardware_config()
+            print(f"Invalid config file ({e}), using defaults")
+
+    def _refresh_authorized_cards(self):
+        """Rebuild the cached views of authorized_cards after it changes"""
+        # Read-only set for O(1) access checks and the count for status updates
+        self._authorized_set = frozenset(self.config["authorized_cards"])
+        self._auth_count = len(self.config["authorized_cards"])
+
+    def _refresh_hardware_config(self):
+        """Cache the LED and servo settings used on the command path"""
+        # Pins are sent as single bytes of the command frames
+        for color, pin in self.config["led_pins"].items():
+            if not isinstance(pin, int) or not 0 <= pin <= 255:
+                raise ValueError(f"invalid {color} LED pin {pin!r}")
+        # Servo positions also go into the status frame, in servo degrees
+        for key in ("servo_default_pos", "servo_allowed_pos"):
+            pos = self.config[key]
+            if not isinstance(pos, int) or not 0 <= pos <= 180:
+                raise ValueError(f"invalid {key} {pos!r}")
+        self._led_pins = self.config["led_pins"].copy()
+        self._servo_default_pos = self.config["servo_default_pos"]
+        self._servo_allowed_pos = self.config["servo_allowed_pos"]
+        self._build_packet_table()
+
+    def _build_packet_table(self):
+        """Precompute the frames for every LED and servo-enable command"""
+        self._led_packets = {
+            (color, state): _frame(OP_LED, pin, int(state))
+            for color, pin in self._led_pins.items()
+            for state in (False, True)
+        }
+        self._servo_en_packets = {
+            state: _frame(OP_SERVO_EN, int(state))
+            for state in (False, True)
+        }
 
     def save_config(self, filename="config.json"):
         """Save configuration to JSON file"""
-        with open(filename, 'w') as f:
-            json.dump(self.config, f, indent=4)
+        if orjson:
+            data = orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+        else:
+            data = _config_encoder.encode(self.config).encode()
+        # Write a temporary file, sync it to disk and rename it over the old
+        # config, so neither a crash nor a power loss mid-save leaves a
+        # truncated config behind
+        tmp_filename = filename + ".tmp"
+        try:
+            with open(tmp_filename, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_filename, filename)
+        except OSError:
+            # Don't leave a partial temporary file next to the config
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
+            raise
         print("Configuration saved")
 
     def handle_rfid_data(self, data):
         """Process RFID card reads"""
         try:
-            card_id = ''.join([chr(byte) for byte in data]).strip()
+            card_id = bytes(data).decode('ascii', errors='ignore').strip()
             print(f"Card read: {card_id}")
             
-            if card_id in self.config["authorized_cards"]:
+            if card_id in self._authorized_set:
                 self.grant_access()
             else:
                 self.deny_access()
@@ -98,71 +367,126 @@ class RFIDServoController:
         print("Access granted")
         self.control_led("green", True)
         self.enable_servo_control()
-        time.sleep(1)  # LED feedback duration
-        self.control_led("green", False)
+        self.schedule_led_off("green")
 
     def deny_access(self):
         """Actions for unauthorized cards"""
         print("Access denied")
         self.control_led("red", True)
         self.disable_servo_control()
-        time.sleep(1)  # LED feedback duration
-        self.control_led("red", False)
+        self.schedule_led_off("red")
+
+    def schedule_led_off(self, color):
+        """Switch an LED off after the feedback duration without blocking"""
+        timer = self._led_timers.get(color)
+        if timer is not None:
+            timer.cancel()  # A newer card read restarts the feedback window
+        self._led_timers[color] = self.loop.call_later(
+            LED_FEEDBACK_DURATION, self.control_led, color, False
+        )
+
+    def cancel_led_timers(self):
+        """Switch off any LED still waiting on its timer"""
+        for color, timer in self._led_timers.items():
+            timer.cancel()
+            self.control_led(color, False)
+        self._led_timers.clear()
 
     def control_led(self, color, state):
         """Control LED states"""
-        pin = self.config["led_pins"].get(color)
-        if pin is not None:
-            command = {"led": {color: state}}
-            self.send_command(command)
+        packet = self._led_packets.get((color, state))
+        if packet is not None and self._led_state.get(color) != state:
+            self._led_state[color] = state
+            self._queue_tx(packet)
 
     def enable_servo_control(self):
         """Enable servo control"""
+        if self.servo_control_enabled and self.current_servo_pos == self._servo_allowed_pos:
+            return  # Already enabled, e.g. the same card swiped again
         self.servo_control_enabled = True
-        self.current_servo_pos = self.config["servo_allowed_pos"]
-        self.send_command({"servo": {"enable": True}})
+        self.current_servo_pos = self._servo_allowed_pos
+        self._queue_tx(self._servo_en_packets[True])
 
     def disable_servo_control(self):
         """Disable servo control"""
+        if not self.servo_control_enabled and self.current_servo_pos == self._servo_default_pos:
+            return
         self.servo_control_enabled = False
-        self.current_servo_pos = self.config["servo_default_pos"]
-        self.send_command({"servo": {"enable": False}})
+        self.current_servo_pos = self._servo_default_pos
+        self._queue_tx(self._servo_en_packets[False])
 
     def set_servo_position(self, angle):
         """Set servo to specific angle"""
         if 0 <= angle <= 180:
+            if angle == self.current_servo_pos:
+                return True
             self.current_servo_pos = angle
-            self.send_command({"servo": {"set_position": angle}})
+            self.send_frame(OP_SERVO_POS, angle)
             return True
         return False
 
-    def send_command(self, command):
-        """Send JSON command to Arduino"""
-        try:
-            json_str = json.dumps(command) + "\n"
-            self.ser.write(json_str.encode())
-        except serial.SerialException as e:
-            print(f"Error sending command: {e}")
+    def send_frame(self, opcode, arg1=0, arg2=0, arg3=0):
+        """Queue a binary command frame for the Arduino"""
+        self._queue_tx(_frame(opcode, arg1, arg2, arg3))
+
+    def _queue_tx(self, packet):
+        """Queue encoded bytes, flushed once the current loop iteration ends"""
+        if not self._tx_buf:
+            self.loop.call_soon(self.flush_commands)
+        self._tx_buf += packet
 
-    def send_status_updates(self):
+    def flush_commands(self):
+        """Hand all queued frames to the serial transport in a single write"""
+        if self._tx_buf:
+            self.ser.write(bytes(self._tx_buf))
+            self._tx_buf.clear()
+
+    async def send_status_updates(self):
         """Periodically send system status"""
-        while self.running:
-            status = {
-                "status": {
-                    "servo": {
-                        "position": self.current_servo_pos,
-                        "enabled": self.servo_control_enabled
-                    },
-                    "rfid": {
-                        "cards_registered": len(self.config["authorized_cards"])
-                    }
-                }
-            }
-            self.send_command(status)
-            time.sleep(2)
-
-    def process_user_input(self):
-        """Handle user commands from console"""
+        while True:
+            self.send_frame(
+                OP_STATUS,
+                self.current_servo_pos,
+                int(self.servo_control_enabled),
+                min(self._auth_count, 255)
+            )
+            await asyncio.sleep(STATUS_INTERVAL)
+
+    async def read_arduino_status(self):
+        """Keep the host's servo and LED state in sync with the Arduino"""
+        while True:
+            line = await self.ser_reader.readline()
+            if not line:
+                return  # Link closed
+            if not line.startswith(b"{"):
+                continue  # Boot banner or plain text
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue  # Garbled line
+            if isinstance(message, dict):
+                self.sync_arduino_state(message)
+
+    def sync_arduino_state(self, message):
+        """Apply an Arduino status message to the host's copy of its state"""
+        # The firmware's own card reader changes the servo and LEDs without
+        # the host asking, so its reports are the source of truth
+        status = message.get("status")
+        if status == "servo_control_enabled":
+            self.servo_control_enabled = True
+            self.current_servo_pos = self._servo_allowed_pos
+        elif status == "servo_control_disabled":
+            self.servo_control_enabled = False
+            self.current_servo_pos = self._servo_default_pos
+        elif status == "position_set":
+            angle = message.get("angle")
+            if isinstance(angle, int) and 0 <= angle <= 180:
+                self.current_servo_pos = angle
+        elif status in ("authorized", "unauthorized"):
+            self._led_state.clear()
+
+    def print_controls(self):
+        """Show the console command menu"""
         print("\nControl commands:")
         print("1 - Enable servo control")
         print("2 - Disable servo control")
@@ -170,65 +494,139 @@ class RFIDServoController:
         print("4 - Add authorized card")
         print("5 - Save configuration")
         print("q - Quit")
+
+    def process_user_input(self, line):
+        """Handle a user command from the console"""
+        cmd = line.lower()
         
-        while self.running:
-            cmd = input("Enter command: ").strip().lower()
-            
-            if cmd == '1':
-                self.enable_servo_control()
-            elif cmd == '2':
-                self.disable_servo_control()
-            elif cmd == '3':
-                try:
-                    pos = int(input("Enter position (0-180): "))
-                    if self.set_servo_position(pos):
-                        print(f"Servo set to {pos} degrees")
-                    else:
-                        print("Invalid position")
-                except ValueError:
-                    print("Please enter a number")
-            elif cmd == '4':
-                card = input("Enter new card ID: ").strip()
-                if card and card not in self.config["authorized_cards"]:
-                    self.config["authorized_cards"].append(card)
-                    print(f"Card {card} added")
-                else:
-                    print("Invalid or duplicate card ID")
-            elif cmd == '5':
-                self.save_config()
-            elif cmd == 'q':
-                self.running = False
-                print("Exiting...")
+        if cmd == '1':
+            self.enable_servo_control()
+        elif cmd == '2':
+            self.disable_servo_control()
+        elif cmd == '3':
+            print("Enter position (0-180): ", end="", flush=True)
+            self._input_handler = self.read_servo_position
+        elif cmd == '4':
+            print("Enter new card ID: ", end="", flush=True)
+            self._input_handler = self.read_new_card
+        elif cmd == '5':
+            self.save_config()
+        elif cmd == 'q':
+            self.stop()
+            print("Exiting...")
+        else:
+            print("Invalid command")
+
+    def read_servo_position(self, line):
+        """Handle the position answer of the '3' command"""
+        try:
+            pos = int(line)
+            if self.set_servo_position(pos):
+                print(f"Servo set to {pos} degrees")
             else:
-                print("Invalid command")
+                print("Invalid position")
+        except ValueError:
+            print("Please enter a number")
 
-    def run(self):
-        """Main execution loop"""
+    def read_new_card(self, card):
+        """Handle the card ID answer of the '4' command"""
+        if card and card not in self._authorized_set:
+            self.config["authorized_cards"].append(card)
+            self._refresh_authorized_cards()
+            print(f"Card {card} added")
+        else:
+            print("Invalid or duplicate card ID")
+
+    def _handle_stdin(self):
+        """Read console input once the event loop reports stdin readable"""
+        # Read the raw fd so several lines arriving at once are all handled
+        chunk = os.read(sys.stdin.fileno(), 1024)
+        if not chunk:
+            self.loop.remove_reader(sys.stdin.fileno())  # stdin closed, keep serving cards
+            return
+        *lines, self._stdin_buf = (self._stdin_buf + chunk).split(b"\n")
+        for line in lines:
+            handler, self._input_handler = self._input_handler, self.process_user_input
+            handler(line.decode(errors='ignore').strip())
+            if not self.running:
+                return
+            if self._input_handler == self.process_user_input:
+                print("Enter command: ", end="", flush=True)
+
+    def _on_task_done(self, task):
+        """Shut down if a background task died instead of failing silently"""
+        if task.cancelled() or task.exception() is None:
+            return
+        print(f"\n{task.get_name()} failed: {task.exception()!r}, shutting down")
+        self.stop()
+
+    def stop(self):
+        """Ask the event loop to shut the controller down"""
+        self.running = False
+        self._stopped.set()
+
+    async def main(self):
+        """Serve the RFID reader, console and Arduino link until quit"""
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._input_handler = self.process_user_input
+        self._stdin_buf = b""
+        console = False
+        tasks = []
+        
         try:
-            # Start user input thread
-            input_thread = Thread(target=self.process_user_input)
-            input_thread.start()
+            await self.init_serial_connection()
             
-            print("RFID-Servo Controller started. Waiting for cards...")
+            # Console input and libusb fds are all watched by the event loop
+            try:
+                self.loop.add_reader(sys.stdin.fileno(), self._handle_stdin)
+                console = True
+            except (OSError, ValueError):
+                # stdin is /dev/null, a regular file or closed: run headless
+                print("No console input available, serving cards only")
+            for fd, events in self.usb_ctx.getPollFDList():
+                self._watch_usb_fd(fd, events)
+            self.usb_ctx.setPollFDNotifiers(self._watch_usb_fd, self._unwatch_usb_fd)
+            self.pump_usb_events()
+            tasks.append(asyncio.create_task(self.send_status_updates(), name="status updates"))
+            tasks.append(asyncio.create_task(self.read_arduino_status(), name="Arduino status reader"))
+            for task in tasks:
+                task.add_done_callback(self._on_task_done)
             
-            # Main RFID reading loop
-            while self.running:
-                try:
-                    data = self.dev.read(
-                        self.endpoint.bEndpointAddress,
-                        self.endpoint.wMaxPacketSize
-                    )
-                    self.handle_rfid_data(data)
-                except usb.core.USBError:
-                    pass
-                time.sleep(0.1)
-                
-        except KeyboardInterrupt:
-            self.running = False
+            if console:
+                self.print_controls()
+            print("RFID-Servo Controller started. Waiting for cards...")
+            if console:
+                print("Enter command: ", end="", flush=True)
+            await self._stopped.wait()
         finally:
-            self.ser.close()
+            # Stop reading before releasing the hardware
+            self.running = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if console:
+                self.loop.remove_reader(sys.stdin.fileno())
+            self.usb_ctx.setPollFDNotifiers()
+            for fd, _ in self.usb_ctx.getPollFDList():
+                self._unwatch_usb_fd(fd)
+            if self._usb_timer is not None:
+                self._usb_timer.cancel()
+            self.close_rfid_reader()
+            self.cancel_led_timers()
+            if self.ser is not None:
+                self.flush_commands()  # Ship whatever was queued during shutdown
+                self.ser.close()  # Closing waits for the transport to drain
+                await self.ser.wait_closed()
             print("System shutdown complete")
 
+    def run(self):
+        """Main execution loop"""
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            pass
+
 if __name__ == "__main__":
     controller = RFIDServoController()
     controller.run()
\ No newline at end of file
@@ -8,6 +8,16 @@
 #define GREEN_LED 3
 #define RED_LED 4
 
+// Binary command frames from the host:
+// [magic][opcode][arg1][arg2][arg3][checksum], checksum = opcode ^ arg1 ^ arg2 ^ arg3
+#define FRAME_MAGIC 0xA5
+#define FRAME_SIZE 6
+#define MAX_LINE_LENGTH 64
+#define OP_LED 1        // arg1 = pin, arg2 = on/off
+#define OP_SERVO_EN 2   // arg1 = enable/disable
+#define OP_SERVO_POS 3  // arg1 = angle
+#define OP_STATUS 4     // arg1 = servo position, arg2 = enabled, arg3 = cards registered
+
 Servo servo;
 MFRC522 rfid(SS_PIN, RST_PIN);
 
@@ -22,6 +32,11 @@ Config config;
 int currentServoPos = 90;
 bool servoControlEnabled = false;
 
+// Serial input state: a partially received frame and a partial text line
+byte frame[FRAME_SIZE];
+byte frameLength = 0;
+String lineBuffer = "";
+
 void setup() {
   // Initialize hardware
   pinMode(GREEN_LED, OUTPUT);
@@ -30,7 +45,7 @@ void setup() {
   servo.write(config.servoDefaultPos);
   
   // Initialize serial communication
-  Serial.begin(9600);
+  Serial.begin(500000);
   while (!Serial); // Wait for serial port to connect
   
   // Initialize RFID reader
@@ -42,8 +57,8 @@ void setup() {
 
 void loop() {
   // Handle serial commands
-  if (Serial.available() > 0) {
-    handleSerialCommand();
+  while (Serial.available() > 0) {
+    handleSerialByte(Serial.read());
   }
 
   // Check for RFID cards
@@ -57,8 +72,43 @@ void loop() {
   }
 }
 
-void handleSerialCommand() {
-  String input = Serial.readStringUntil('\n');
+void handleSerialByte(byte c) {
+  if (frameLength > 0) {
+    frame[frameLength++] = c;
+    if (frameLength == FRAME_SIZE) {
+      frameLength = 0;
+      if ((frame[1] ^ frame[2] ^ frame[3] ^ frame[4]) == frame[5]) {
+        handleFrame();
+      } else {
+        resyncFrame();
+      }
+    }
+  } else if (c == FRAME_MAGIC) {
+    frame[0] = c;
+    frameLength = 1;
+  } else if (c == '\n') {
+    handleSerialCommand(lineBuffer);
+    lineBuffer = "";
+  } else if (c >= 0x20 && c < 0x7F && lineBuffer.length() < MAX_LINE_LENGTH) {
+    lineBuffer += (char)c;
+  }
+  // Anything else (noise, '\r', stray frame bytes) is dropped so the
+  // next magic byte realigns on a frame
+}
+
+void resyncFrame() {
+  // The magic byte was noise; restart from the next magic byte inside
+  // the rejected frame, if there is one
+  for (byte i = 1; i < FRAME_SIZE; i++) {
+    if (frame[i] == FRAME_MAGIC) {
+      frameLength = FRAME_SIZE - i;
+      memmove(frame, frame + i, frameLength);
+      return;
+    }
+  }
+}
+
+void handleSerialCommand(String input) {
   input.trim();
   
   // Check if it's a JSON configuration
@@ -93,6 +143,30 @@ void handleSerialCommand() {
   }
 }
 
+void handleFrame() {
+  switch (frame[1]) {
+    case OP_LED:
+      // Only drive the pins configured as LED outputs
+      if (frame[2] == GREEN_LED || frame[2] == RED_LED) {
+        digitalWrite(frame[2], frame[3] ? HIGH : LOW);
+      }
+      break;
+    case OP_SERVO_EN:
+      if (frame[2]) {
+        enableServoControl();
+      } else {
+        disableServoControl();
+      }
+      break;
+    case OP_SERVO_POS:
+      setServoPosition(frame[2]);
+      break;
+    case OP_STATUS:
+      // Periodic host status, nothing to act on
+      break;
+  }
+}
+
 void handleRFID() {
   // Extract UID
   String uid = "";